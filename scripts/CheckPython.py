@@ -1,5 +1,11 @@
-﻿import subprocess
+﻿import functools
+import hashlib
+import os
+import re
+import site
+import subprocess
 import sys
+import sysconfig
 
 try:
     from importlib.metadata import distributions
@@ -7,18 +13,77 @@ except ImportError:
     # Fallback for Python < 3.8
     from importlib_metadata import distributions
 
-def install(package):
-    print(f"  Instalando {package}...")
-    subprocess.check_call([sys.executable, '-m', 'pip', 'install', package, '--quiet'])
-    print(f"  ✓ {package} instalado")
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REQUIREMENTS_PATH = os.path.join(SCRIPTS_DIR, 'requirements.txt')
+# Holds the hash of the last requirements validated with this interpreter
+PACKAGES_OK_PATH = os.path.join(SCRIPTS_DIR, '.packages_ok')
+
+def _NormalizeName(name):
+    return name.lower().replace('_', '-')
+
+@functools.lru_cache(maxsize=1)
+def InstalledPackages():
+    # Scanned at most once per run; every ValidatePackage call checks membership here
+    return frozenset(
+        _NormalizeName(dist.metadata['Name'])
+        for dist in distributions()
+        if dist.metadata['Name']
+    )
+
+def ReadRequirements(content):
+    lines = (line.split('#', 1)[0].strip() for line in content.decode('utf-8').splitlines())
+    return [line for line in lines if line]
+
+def SitePackagesState():
+    """
+    mtime de las carpetas de paquetes de este interprete: instalar, actualizar o desinstalar
+    un paquete (o recrear el venv en la misma ruta) las cambia.
+    """
+    paths = {sysconfig.get_paths()['purelib'], sysconfig.get_paths()['platlib']}
+    if site.ENABLE_USER_SITE:
+        paths.add(site.getusersitepackages())
+    state = []
+    for path in sorted(paths):
+        try:
+            state.append(f"{path}={os.stat(path).st_mtime_ns}")
+        except OSError:
+            state.append(f"{path}=-")
+    return "\n".join(state)
+
+def RequirementsHash(requirements):
+    # Otro interprete tiene sus propios site-packages, asi que tambien forma parte de la clave
+    key = b"\0".join([requirements, sys.executable.encode('utf-8'), SitePackagesState().encode('utf-8')])
+    return hashlib.sha1(key).hexdigest()
+
+def install(*packages):
+    print(f"  Instalando {', '.join(packages)}...")
+    subprocess.check_call([sys.executable, '-m', 'pip', 'install', '--quiet', *packages])
+    for package in packages:
+        print(f"  ✓ {package} instalado")
 
 def ValidatePackage(package):
-    try:
-        __import__(package.replace('-', '_'))
+    name = re.split(r'[\s<>=!~;\[]', package, maxsplit=1)[0]
+    if _NormalizeName(name) in InstalledPackages():
         print(f"  ✓ {package} ya instalado")
-    except ImportError:
-        install(package)
+        return True
+    return False
 
 def ValidatePackages():
-    ValidatePackage('requests')
-    ValidatePackage('fake-useragent')
\ No newline at end of file
+    with open(REQUIREMENTS_PATH, 'rb') as f:
+        requirements = f.read()
+    
+    try:
+        with open(PACKAGES_OK_PATH, encoding='utf-8') as f:
+            if f.read().strip() == RequirementsHash(requirements):
+                print("  ✓ Paquetes ya verificados")
+                return
+    except OSError:
+        pass
+    
+    missing = [package for package in ReadRequirements(requirements) if not ValidatePackage(package)]
+    if missing:
+        install(*missing)
+    
+    # Despues de instalar, que ya ha cambiado las carpetas de paquetes
+    with open(PACKAGES_OK_PATH, 'w', encoding='utf-8') as f:
+        f.write(RequirementsHash(requirements))
\ No newline at end of file
@@ -1,27 +1,34 @@
 import os
 import sys
-import urllib.request
-import zipfile
-import shutil
+
+import Utils
 
 def download_file(url, destination):
     """Descarga un archivo con barra de progreso"""
-    print(f"Descargando desde: {url}")
+    import urllib.request
     
-    def reporthook(count, block_size, total_size):
-        percent = int(count * block_size * 100 / total_size)
-        sys.stdout.write(f"\r{percent}% completado")
-        sys.stdout.flush()
+    print(f"Descargando desde: {url}")
     
-    urllib.request.urlretrieve(url, destination, reporthook)
+    with urllib.request.urlopen(url) as response, open(destination, 'wb', buffering=Utils.COPY_BUFFER_SIZE) as f:
+        total_size = int(response.headers.get('Content-Length') or 0)
+        downloaded = 0
+        while True:
+            chunk = response.read(Utils.COPY_BUFFER_SIZE)
+            if not chunk:
+                break
+            f.write(chunk)
+            downloaded += len(chunk)
+            # Un refresco de progreso por bloque, no por cada lectura de 8 KiB
+            if total_size:
+                sys.stdout.write(f"\r{downloaded * 100 // total_size}% completado")
+                sys.stdout.flush()
     print("\n? Descarga completada")
 
 def extract_zip(zip_path, extract_to):
     """Extrae un archivo ZIP"""
     print(f"Extrayendo a: {extract_to}")
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_to)
-    print("? Extraccin completada")
+    Utils.ExtractZip(zip_path, extract_to)
+    print("? Extracción completada")
 
 def setup_assimp_prebuilt():
     print("="*60)
@@ -29,7 +36,7 @@ def setup_assimp_prebuilt():
     print("="*60)
     print()
     
-    # Cambiar al directorio raz del proyecto
+    # Cambiar al directorio raíz del proyecto
     script_dir = os.path.dirname(os.path.realpath(__file__))
     os.chdir(os.path.join(script_dir, '../'))
     
@@ -38,11 +45,11 @@ def setup_assimp_prebuilt():
     temp_dir = "temp_assimp"
     
     # URL de descarga (Assimp 5.3.1 precompilado para VS2022)
-    # Nota: Esta es una URL de ejemplo. Debers encontrar la URL correcta de las releases
+    # Nota: Esta es una URL de ejemplo. Deberás encontrar la URL correcta de las releases
     assimp_version = "5.3.1"
     
     print("IMPORTANTE:")
-    print("Este script necesita que descargues manualmente las libreras precompiladas.")
+    print("Este script necesita que descargues manualmente las librerías precompiladas.")
     print()
     print("Sigue estos pasos:")
     print()
@@ -53,7 +60,7 @@ def setup_assimp_prebuilt():
     print("   - assimp-sdk-{version}-setup.exe (ejecutalo y anota donde se instala)")
     print("   - O busca archivos que contengan 'vc143' o 'vs2022'")
     print()
-    print("3. Necesitas estos archivos especficos:")
+    print("3. Necesitas estos archivos específicos:")
     print("   Debug:")
     print("     - assimp-vc143-mtd.lib")
     print("     - assimp-vc143-mtd.dll")
@@ -61,7 +68,7 @@ def setup_assimp_prebuilt():
     print("     - assimp-vc143-mt.lib")
     print("     - assimp-vc143-mt.dll")
     print()
-    print("4. Cpialos a:")
+    print("4. Cópialos a:")
     print(f"   {os.path.abspath(lib_dir)}/Debug/")
     print(f"   {os.path.abspath(lib_dir)}/Release/")
     print()
@@ -73,9 +80,6 @@ def setup_assimp_prebuilt():
     print("="*60)
     print()
     
-    input("Presiona Enter cuando hayas copiado los archivos...")
-    
-    # Verificar que los archivos existan
     required_files = [
         f"{lib_dir}/Debug/assimp-vc143-mtd.lib",
         f"{lib_dir}/Debug/assimp-vc143-mtd.dll",
@@ -83,10 +87,11 @@ def setup_assimp_prebuilt():
         f"{lib_dir}/Release/assimp-vc143-mt.dll"
     ]
     
-    missing_files = []
-    for file in required_files:
-        if not os.path.exists(file):
-            missing_files.append(file)
+    print("Esperando a que copies los archivos (se detectan solos, o presiona Enter)...")
+    # Solo hace falta ver cuales faltan si no llegaron todos (se pulso Enter antes);
+    # en ese caso, un solo listado por carpeta (Debug/Release) en lugar de un stat por archivo
+    missing = set() if Utils.WaitForFiles(required_files) else Utils.FindMissingFiles(required_files)
+    missing_files = [file for file in required_files if file in missing]
     
     if missing_files:
         print()
@@ -121,4 +126,4 @@ if __name__ == "__main__":
         import traceback
         traceback.print_exc()
     
-    input("\nPresiona Enter para salir...")
+    Utils.Pause("\nPresiona Enter para salir...")
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
+import functools
 import os
+import re
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import shutil
 
 import Utils
 
@@ -17,8 +20,12 @@ KTX_SOURCE_URL = f'https://github.com/KhronosGroup/KTX-Software/archive/refs/tag
 # Windows installer (contains binaries)
 KTX_INSTALLER_URL = f'https://github.com/KhronosGroup/KTX-Software/releases/download/v{LUNEX_KTX_VERSION}/KTX-Software-{LUNEX_KTX_VERSION}-Windows-x64.exe'
 
+# Export rows of `dumpbin /EXPORTS`: ordinal, hint, RVA (8 hex digits), name
+DUMPBIN_EXPORT_RE = re.compile(rb'^[ \t]*\d+[ \t]+[0-9A-Fa-f]+[ \t]+[0-9A-Fa-f]{8}[ \t]+(\S+)', re.M)
+
+@functools.lru_cache(maxsize=1)
 def GetKTXSDKPath():
-    """Busca el SDK de KTX en ubicaciones conocidas"""
+    """Busca el SDK de KTX en ubicaciones conocidas (resultado cacheado)"""
     # Buscar en vendor/ktx (instalacion local del proyecto)
     local_ktx = os.path.abspath(KTX_SDK_LOCAL_PATH)
     if os.path.exists(local_ktx) and os.path.exists(os.path.join(local_ktx, 'include', 'ktx.h')):
@@ -31,13 +38,8 @@ def GetKTXSDKPath():
     
     return None
 
-KTX_SDK = GetKTXSDKPath()
-
 def DownloadAndExtractSource():
     """Descarga el source code y extrae los headers"""
-    import zipfile
-    import urllib.request
-    
     zip_path = f'{KTX_SDK_LOCAL_PATH}/ktx-source.zip'
     
     print(f'Descargando KTX-Software source (para headers)...')
@@ -53,12 +55,10 @@ def DownloadAndExtractSource():
     
     print(f'\nExtrayendo headers...')
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # Extract only what we need
-            for member in zip_ref.namelist():
-                # Extract include folder
-                if '/include/' in member or '/lib/' in member:
-                    zip_ref.extract(member, KTX_SDK_LOCAL_PATH)
+        # Extract only what we need: the top-level include and lib folders of the archive
+        archive_root = f'KTX-Software-{LUNEX_KTX_VERSION}/'
+        wanted_prefixes = (archive_root + 'include/', archive_root + 'lib/')
+        Utils.ExtractZip(zip_path, KTX_SDK_LOCAL_PATH, lambda member: member.startswith(wanted_prefixes))
         
         # Move files to correct location
         source_dir = f'{KTX_SDK_LOCAL_PATH}/KTX-Software-{LUNEX_KTX_VERSION}'
@@ -100,14 +100,18 @@ def DownloadBinaries():
     print("Por favor:")
     print("  1. Instala en la ubicacion por defecto (C:\\Program Files\\KTX-Software)")
     print("  2. Completa la instalacion")
-    print("  3. Vuelve aqui y presiona Enter")
+    print("  3. El setup continuara solo al detectar ktx.dll (o presiona Enter)")
     print()
     
     installer_path = f'{KTX_SDK_LOCAL_PATH}/KTX-Installer.exe'
+    program_files_ktx = "C:/Program Files/KTX-Software"
+    ktx_dll = f"{program_files_ktx}/bin/ktx.dll"
     
     try:
         Utils.DownloadFile(KTX_INSTALLER_URL, installer_path)
         print("Instalador descargado, abriendo...")
+        # Estado de ktx.dll antes de instalar: si ya existe, hay que esperar a que el instalador la reemplace
+        before_install = Utils.FileSnapshot([ktx_dll])
         os.startfile(os.path.abspath(installer_path))
     except Exception as e:
         print(f"Error: {e}")
@@ -115,12 +119,9 @@ def DownloadBinaries():
         print(f"  {KTX_INSTALLER_URL}")
         return False
     
-    input("\nPresiona Enter cuando hayas completado la instalacion...")
-    
     # Copy DLL and LIB from Program Files
-    program_files_ktx = "C:/Program Files/KTX-Software"
-    
-    if not os.path.exists(f"{program_files_ktx}/bin/ktx.dll"):
+    print("\nEsperando a que termine la instalacion...")
+    if not Utils.WaitForFiles([ktx_dll], since=before_install):
         print("\nNo se encontro ktx.dll en la instalacion.")
         print("Asegurate de haber instalado KTX-Software correctamente.")
         return False
@@ -133,7 +134,7 @@ def DownloadBinaries():
     
     # Copy DLL
     print("\nCopiando binarios...")
-    shutil.copy(f"{program_files_ktx}/bin/ktx.dll", f"{bin_dest}/ktx.dll")
+    shutil.copy(ktx_dll, f"{bin_dest}/ktx.dll")
     print(f"  Copiado: ktx.dll")
     
     # The installer doesn't include .lib files, we need to generate them
@@ -144,35 +145,38 @@ def DownloadBinaries():
     
     return True
 
-def CreateLibFromDLL():
-    """Intenta crear ktx.lib desde ktx.dll usando herramientas de VS"""
-    lib_dest = f'{KTX_SDK_LOCAL_PATH}/lib'
-    bin_path = f'{KTX_SDK_LOCAL_PATH}/bin/ktx.dll'
-    
-    if not os.path.exists(bin_path):
-        return False
-    
-    # Try to find Visual Studio tools
+@functools.lru_cache(maxsize=1)
+def FindVSTools():
+    """Busca dumpbin.exe y lib.exe de Visual Studio 2022 (cacheado)"""
     vs_paths = [
         r"C:\Program Files\Microsoft Visual Studio\2022\Community\VC\Tools\MSVC",
         r"C:\Program Files\Microsoft Visual Studio\2022\Professional\VC\Tools\MSVC",
         r"C:\Program Files\Microsoft Visual Studio\2022\Enterprise\VC\Tools\MSVC",
     ]
     
-    dumpbin_path = None
-    lib_tool_path = None
-    
     for vs_base in vs_paths:
-        if os.path.exists(vs_base):
-            # Find latest MSVC version
-            versions = sorted(os.listdir(vs_base), reverse=True)
-            if versions:
-                tools_path = os.path.join(vs_base, versions[0], "bin", "Hostx64", "x64")
-                if os.path.exists(os.path.join(tools_path, "dumpbin.exe")):
-                    dumpbin_path = os.path.join(tools_path, "dumpbin.exe")
-                    lib_tool_path = os.path.join(tools_path, "lib.exe")
-                    break
+        # Find latest MSVC version (single pass, no sort)
+        try:
+            with os.scandir(vs_base) as entries:
+                latest = max(entries, key=lambda entry: entry.name).name
+        except (OSError, ValueError):
+            continue
+        
+        tools_path = os.path.join(vs_base, latest, "bin", "Hostx64", "x64")
+        if os.path.exists(os.path.join(tools_path, "dumpbin.exe")):
+            return os.path.join(tools_path, "dumpbin.exe"), os.path.join(tools_path, "lib.exe")
+    
+    return None, None
+
+def CreateLibFromDLL():
+    """Intenta crear ktx.lib desde ktx.dll usando herramientas de VS"""
+    lib_dest = f'{KTX_SDK_LOCAL_PATH}/lib'
+    bin_path = f'{KTX_SDK_LOCAL_PATH}/bin/ktx.dll'
+    
+    if not os.path.exists(bin_path):
+        return False
     
+    dumpbin_path, lib_tool_path = FindVSTools()
     if not dumpbin_path:
         print("  No se encontraron herramientas de Visual Studio para crear .lib")
         return False
@@ -183,21 +187,11 @@ def CreateLibFromDLL():
         
         result = subprocess.run(
             [dumpbin_path, "/EXPORTS", bin_path],
-            capture_output=True,
-            text=True
+            capture_output=True
         )
         
         # Parse exports
-        exports = []
-        in_exports = False
-        for line in result.stdout.split('\n'):
-            if 'ordinal' in line.lower() and 'name' in line.lower():
-                in_exports = True
-                continue
-            if in_exports:
-                parts = line.split()
-                if len(parts) >= 4:
-                    exports.append(parts[3])
+        exports = [match.group(1).decode() for match in DUMPBIN_EXPORT_RE.finditer(result.stdout)]
         
         if not exports:
             print("  No se encontraron exports en la DLL")
@@ -239,20 +233,24 @@ def InstallKTXSDK():
     if not DownloadAndExtractSource():
         return False
     
-    # Step 2: Download and install binaries
-    if not DownloadBinaries():
-        return False
+    # Step 2: Download and install binaries, looking up the VS tools
+    # for step 3 while the installer runs
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        vs_tools = executor.submit(FindVSTools)
+        if not DownloadBinaries():
+            return False
+        vs_tools.result()
     
     # Step 3: Try to create .lib from DLL
     CreateLibFromDLL()
     
-    # Verify installation
-    global KTX_SDK
-    KTX_SDK = GetKTXSDKPath()
+    # Verify installation (the cached lookup predates the install)
+    GetKTXSDKPath.cache_clear()
+    ktx_sdk = GetKTXSDKPath()
     
-    if KTX_SDK:
-        print(f"\nKTX-Software SDK instalado en: {KTX_SDK}")
-        SaveKTXPath(KTX_SDK)
+    if ktx_sdk:
+        print(f"\nKTX-Software SDK instalado en: {ktx_sdk}")
+        SaveKTXPath(ktx_sdk)
         return True
     else:
         print("\nError: No se pudo verificar la instalacion")
@@ -273,10 +271,9 @@ def InstallKTXPrompt():
 
 def CheckKTXSDK():
     """Verifica si KTX-Software esta instalado"""
-    global KTX_SDK
-    KTX_SDK = GetKTXSDKPath()
+    ktx_sdk = GetKTXSDKPath()
     
-    if KTX_SDK is None:
+    if ktx_sdk is None:
         print("\n" + "!"*60)
         print("WARNING: KTX-Software SDK no esta instalado!")
         print("!"*60)
@@ -286,10 +283,10 @@ def CheckKTXSDK():
         print("  - Carga mas rapida de texturas")
         return InstallKTXPrompt()
     
-    print(f"KTX-Software SDK encontrado: {KTX_SDK}")
+    print(f"KTX-Software SDK encontrado: {ktx_sdk}")
     
     # Guardar path para premake
-    SaveKTXPath(KTX_SDK)
+    SaveKTXPath(ktx_sdk)
     
     return True
 
@@ -308,25 +305,26 @@ def SaveKTXPath(ktx_path):
 
 def CheckKTXSDKDebugLibs():
     """Verifica las librerias de KTX"""
-    if KTX_SDK is None:
+    ktx_sdk = GetKTXSDKPath()
+    if ktx_sdk is None:
         return False
     
     # Verificar include
-    include_path = Path(f"{KTX_SDK}/include")
+    include_path = Path(f"{ktx_sdk}/include")
     if not (include_path / "ktx.h").exists():
         print(f"\n  ktx.h no encontrado en: {include_path}")
         return False
     print(f"  Headers encontrados en: {include_path}")
     
     # Verificar DLL
-    bin_path = Path(f"{KTX_SDK}/bin")
+    bin_path = Path(f"{ktx_sdk}/bin")
     if (bin_path / "ktx.dll").exists():
         print(f"  ktx.dll encontrado en: {bin_path}")
     else:
         print(f"  ADVERTENCIA: ktx.dll no encontrado")
     
     # Verificar lib
-    lib_path = Path(f"{KTX_SDK}/lib")
+    lib_path = Path(f"{ktx_sdk}/lib")
     if (lib_path / "ktx.lib").exists():
         print(f"  ktx.lib encontrado en: {lib_path}")
     else:
@@ -358,4 +356,4 @@ if __name__ == "__main__":
         print("="*60)
         print("  La compresion de texturas funcionara en modo compatibilidad")
     
-    input("\nPresiona Enter para salir...")
+    Utils.Pause("\nPresiona Enter para salir...")
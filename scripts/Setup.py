@@ -1,6 +1,19 @@
-﻿import os
+﻿import collections
+import hashlib
+import json
+import os
+import shutil
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_IS_WIN = os.name == 'nt'
+# Las salidas capturadas no necesitan consola propia en Windows
+_NO_WINDOW = subprocess.CREATE_NO_WINDOW if _IS_WIN else 0
+
+# Resuelto una sola vez en lugar de buscar en PATH en cada llamada a git
+GIT = shutil.which("git") or "git"
 
 # Change to root directory
 script_dir = os.path.dirname(os.path.realpath(__file__))
@@ -12,27 +25,142 @@ import CheckPython
 print("Verificando paquetes de Python...")
 CheckPython.ValidatePackages()
 
+import Utils
 import Vulkan
 import KTX
 
-print("\n[2/8] Clonando/actualizando submodulos...")
-result = subprocess.call(["git", "submodule", "update", "--init", "--recursive"])
+# Lineas de salida que se guardan de cada comando para mostrarlas si falla
+RUN_OUTPUT_TAIL = 200
+
+# Procesos de RunCommand aún en marcha, para poder terminarlos si Setup se interrumpe
+_running_processes = set()
+_running_lock = threading.Lock()
+_stopping = False
 
-if result != 0:
-    print("\n" + "!"*60)
-    print("WARNING: Conflictos detectados en submódulos.")
-    print("Reseteando submódulos a versiones limpias...")
-    print("!"*60)
+def RunCommand(command, output=None, show=False):
+    """
+    Ejecuta un comando y devuelve su codigo de salida.
+    La salida solo se muestra si el comando falla (sus ultimas RUN_OUTPUT_TAIL lineas),
+    o en cuanto llega si `show` es True. Va a `output` (lista) si se pasa, o a la consola.
+    Tras StopRunningCommands no lanza nada y devuelve 1.
+    """
+    emit = output.append if output is not None else print
+    tail = collections.deque(maxlen=RUN_OUTPUT_TAIL)
+    with _running_lock:
+        if _stopping:
+            return 1
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, errors='replace', creationflags=_NO_WINDOW)
+        _running_processes.add(process)
+    try:
+        with process:
+            for line in process.stdout:
+                if show:
+                    emit(line.rstrip('\n'))
+                else:
+                    tail.append(line.rstrip('\n'))
+    finally:
+        with _running_lock:
+            _running_processes.discard(process)
     
-    # Resetear todos los submódulos a su estado limpio
-    subprocess.call(["git", "submodule", "foreach", "--recursive", "git", "reset", "--hard"])
-    subprocess.call(["git", "submodule", "foreach", "--recursive", "git", "clean", "-fd"])
+    if process.returncode != 0 and tail:
+        emit("\n".join(tail))
+    return process.returncode
+
+def StopRunningCommands():
+    """
+    Termina los comandos en marcha e impide lanzar más. Los git con CREATE_NO_WINDOW no
+    reciben el Ctrl+C de la consola: sin esto el hilo de fondo seguiría hasta acabar.
+    """
+    global _stopping
+    with _running_lock:
+        _stopping = True
+        for process in _running_processes:
+            process.terminate()
+
+def GetSubmoduleStatus():
+    """
+    Devuelve {ruta: estado} segun `git submodule status --recursive`, o None si git falla.
+    Estados: ' ' al dia, '-' sin inicializar, '+' en otro commit, 'U' con conflictos.
+    """
+    status = subprocess.run([GIT, "submodule", "status", "--recursive"], capture_output=True, text=True,
+                            creationflags=_NO_WINDOW)
+    if status.returncode != 0:
+        return None
     
-    # Intentar actualizar de nuevo
-    result = subprocess.call(["git", "submodule", "update", "--init", "--recursive"])
+    submodule_status = {}
+    for line in status.stdout.splitlines():
+        fields = line[1:].split()
+        if len(fields) >= 2:
+            submodule_status[fields[1]] = line[0]
+    return submodule_status
+
+# Opciones para las llamadas de git que van a la red: protocolo v2 (el servidor filtra las refs),
+# negociación que no recorre todo el historial local e índice pensado para repos con muchos archivos
+GIT_NETWORK_CONFIG = ["-c", "protocol.version=2", "-c", "fetch.negotiationAlgorithm=skipping",
+                      "-c", "feature.manyFiles=true"]
+# Los clones manuales solo necesitan la punta de la rama indicada
+GIT_CLONE_OPTIONS = ["--depth", "1", "--single-branch"]
+
+def ReadSubmoduleJobs():
+    """
+    LUNEX_SUBMODULE_JOBS como entero positivo; sin definir o 0 se usa uno por CPU.
+    Un valor no numérico o negativo avisa y usa también el de por defecto.
+    """
+    value = os.environ.get('LUNEX_SUBMODULE_JOBS', '').strip()
+    try:
+        jobs = int(value or '0')
+    except ValueError:
+        jobs = -1
+    if jobs < 0:
+        print(f"⚠ LUNEX_SUBMODULE_JOBS={value!r} no es válido, se usa uno por CPU")
+        jobs = 0
+    # Siempre positivo: `git submodule update --jobs=0` aborta en git 2.39
+    return jobs or os.cpu_count() or 1
+
+# Submódulos a clonar en paralelo (por defecto uno por CPU); se puede bajar en CI con red lenta
+SUBMODULE_JOBS = ReadSubmoduleJobs()
+
+def SubmoduleUpdateCommand(*paths):
+    # Solo hace falta el commit fijado de cada submódulo, no su historial
+    command = [GIT, *GIT_NETWORK_CONFIG, "-c", f"submodule.fetchJobs={SUBMODULE_JOBS}", "-c", "fetch.parallel=0",
+               "submodule", "update", "--init", "--recursive", f"--jobs={SUBMODULE_JOBS}",
+               "--depth", "1", "--recommend-shallow"]
+    if paths:
+        command += ["--", *paths]
+    return command
+
+def UpdateSubmodules(log):
+    result = RunCommand(SubmoduleUpdateCommand(), log)
+    if result == 0:
+        return result
+    
+    # Ver que submódulos fallaron antes de reintentar a ciegas
+    submodule_status = GetSubmoduleStatus()
+    pending = {} if submodule_status is None else {path: state for path, state in submodule_status.items() if state != ' '}
+    
+    if submodule_status is not None and not pending:
+        log.append("\n✓ Todos los submódulos ya están en su commit, no hace falta reintentar")
+        return 0
+    if not pending:
+        return result
+    
+    log.append("\n" + "!"*60)
+    log.append("WARNING: Conflictos detectados en submódulos.")
+    log.append("Reseteando submódulos a versiones limpias...")
+    log.append("!"*60)
+    
+    # Resetear solo los submódulos modificados o con conflictos (clean solo si el reset funcionó)
+    for path, state in pending.items():
+        if state in '+U' and RunCommand([GIT, "-C", path, "reset", "--hard", "--quiet"], log) == 0:
+            RunCommand([GIT, "-C", path, "clean", "-fd", "--quiet"], log)
+    
+    # Reintentar solo los submódulos afectados (los anidados se actualizan desde su raíz)
+    roots = sorted({min((root for root in submodule_status if path == root or path.startswith(root + '/')), key=len)
+                    for path in pending})
+    return RunCommand(SubmoduleUpdateCommand(*roots), log)
 
 # ✅ Lista completa de submódulos (para clonar manualmente si no están en .gitmodules)
-print("\n[3/8] Verificando dependencias adicionales...")
 submodules = [
     ("vendor/GLFW", "https://github.com/glfw/glfw.git", "master"),
     ("vendor/ImGuiLib", "https://github.com/ocornut/imgui.git", "docking"),
@@ -44,34 +172,8 @@ submodules = [
     ("vendor/Bullet3", "https://github.com/bulletphysics/bullet3.git", "master"),
 ]
 
-# Verificar y clonar submódulos faltantes
-for path, url, branch in submodules:
-    # Verificar si el directorio existe y contiene archivos
-    if not os.path.exists(path) or not os.listdir(path):
-        print(f"\n⚠ {path} no encontrado o vacío, clonando...")
-        
-        # Si existe pero está vacío, eliminarlo
-        if os.path.exists(path):
-            import shutil
-            try:
-                shutil.rmtree(path)
-            except Exception as e:
-                print(f"  Error al eliminar directorio vacío: {e}")
-        
-        # Clonar el repositorio
-        print(f"  Clonando {path} desde {url}...")
-        result = subprocess.call(["git", "clone", "--depth", "1", "-b", branch, url, path])
-        if result == 0:
-            print(f"  ✓ {path} clonado correctamente")
-        else:
-            print(f"  ✗ Error al clonar {path}")
-    else:
-        print(f"  ✓ {path} ya existe")
-
-# Verificar que los submódulos se clonaron correctamente
-print("\n[4/8] Verificando integridad de submódulos...")
-missing_submodules = []
-required_files = {
+# Header principal de cada submódulo: si falta, el submódulo no está bien clonado
+SUBMODULE_REQUIRED_FILES = {
     "vendor/GLFW/include/GLFW/glfw3.h": "GLFW",
     "vendor/ImGuiLib/imgui.h": "ImGui",
     "vendor/glm/glm/glm.hpp": "GLM",
@@ -82,36 +184,262 @@ required_files = {
     "vendor/Bullet3/src/btBulletDynamicsCommon.h": "Bullet3",
 }
 
-all_ok = True
-for path, name in required_files.items():
-    if not os.path.exists(path):
-        missing_submodules.append(f"{name} ({path})")
-        print(f"✗ Falta: {name}")
-        all_ok = False
+def CloneSubmodule(entry):
+    path, url, branch = entry
+    log = []
+    
+    # Si existe pero está vacío, eliminarlo
+    if os.path.exists(path):
+        try:
+            shutil.rmtree(path)
+        except Exception as e:
+            log.append(f"  Error al eliminar directorio vacío {path}: {e}")
+    
+    result = RunCommand([GIT, *GIT_NETWORK_CONFIG, "clone", *GIT_CLONE_OPTIONS, "-b", branch, url, path], log)
+    return result, log
+
+def NeedsClone(path):
+    # Verificar si el directorio existe y contiene archivos
+    return not os.path.exists(path) or not os.listdir(path)
+
+def CloneMissingSubmodules(log):
+    # Verificar y clonar submódulos faltantes (el filtro se hace antes, los hilos solo clonan)
+    missing_clones = []
+    for path, url, branch in submodules:
+        if NeedsClone(path):
+            log.append(f"\n⚠ {path} no encontrado o vacío, clonando...")
+            log.append(f"  Clonando {path} desde {url}...")
+            missing_clones.append((path, url, branch))
+        else:
+            log.append(f"  ✓ {path} ya existe")
+    
+    if not missing_clones:
+        return False
+    
+    # Clonar en paralelo: el tiempo total pasa a ser el del clon más lento
+    max_workers = min(len(missing_clones), 8, os.cpu_count() or 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        clone_results = list(executor.map(CloneSubmodule, missing_clones))
+    for (path, url, branch), (clone_result, clone_log) in zip(missing_clones, clone_results):
+        log.extend(clone_log)
+        if clone_result == 0:
+            log.append(f"  ✓ {path} clonado correctamente")
+        else:
+            log.append(f"  ✗ Error al clonar {path}")
+    return True
+
+SETUP_CACHE_PATH = '.lunex_setup_cache.json'
+
+def ReadHeadCommit():
+    """Lee el commit de HEAD leyendo .git directamente, sin lanzar git (None si no se puede)"""
+    try:
+        with open('.git/HEAD') as f:
+            head = f.read().strip()
+        if not head.startswith('ref: '):
+            return head
+        ref = head[len('ref: '):]
+        if os.path.exists(f'.git/{ref}'):
+            with open(f'.git/{ref}') as f:
+                return f.read().strip()
+        with open('.git/packed-refs') as f:
+            for line in f:
+                if line.rstrip().endswith(' ' + ref):
+                    return line.split()[0]
+    except OSError:
+        pass
+    return None
+
+def SubmodulesUpToDate(submodule_status):
+    """True si todos los submódulos esperados están inicializados y en su commit"""
+    if not submodule_status or any(state != ' ' for state in submodule_status.values()):
+        return False
+    known = {path.lower() for path in submodule_status}
+    return all(path.lower() in known for path, url, branch in submodules)
+
+def LoadSetupCache():
+    try:
+        with open(SETUP_CACHE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def SaveSetupCache(head, submodule_status):
+    with open(SETUP_CACHE_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'head': head, 'submodules': submodule_status}, f, indent=2)
+
+def SyncSubmodules():
+    """
+    Actualiza y completa los submódulos sin escribir en la consola, para poder
+    ejecutarse mientras el hilo principal atiende los SDKs (que pueden preguntar al usuario).
+    Devuelve (True si `git submodule update` funcionó sin recurrir a clones manuales, lineas de salida).
+    """
+    log = []
+    
+    # Mismo commit del proyecto que en el último setup correcto: nada que hacer con git,
+    # siempre que los headers sigan en disco (un `deinit` deja las carpetas vacías)
+    head = ReadHeadCommit()
+    cache = LoadSetupCache()
+    if head and cache.get('head') == head and SubmodulesUpToDate(cache.get('submodules')) \
+            and not Utils.FindMissingFiles(SUBMODULE_REQUIRED_FILES):
+        log.append("✓ Submódulos sin cambios desde el último setup, se omite git")
+        return True, log
+    
+    submodule_status = GetSubmoduleStatus()
+    if SubmodulesUpToDate(submodule_status):
+        log.append("✓ Todos los submódulos están al día")
+        ok = True
     else:
-        print(f"✓ {name}")
-
-if not all_ok:
-    print("\n" + "!"*60)
-    print("ERROR: Algunos submódulos no se clonaron correctamente.")
-    print("Archivos faltantes:")
-    for item in missing_submodules:
-        print(f"  - {item}")
-    print("\nIntenta ejecutar Setup.bat de nuevo o clonar manualmente:")
-    print("  git clone --recursive https://github.com/lluanllo/Lunex_engine.git")
-    print("!"*60)
-    input("\nPresiona Enter para continuar de todos modos...")
+        result = UpdateSubmodules(log)
+        log.append("\nVerificando dependencias adicionales...")
+        cloned = CloneMissingSubmodules(log)
+        ok = result == 0 and not cloned
+        submodule_status = GetSubmoduleStatus() if ok else None
+    
+    if head and SubmodulesUpToDate(submodule_status):
+        SaveSetupCache(head, submodule_status)
+    return ok, log
+
+PREMAKE_STAMP_PATH = 'scripts/.premake_stamp'
+PREMAKE_SOURCE_EXTENSIONS = ('.lua', '.h', '.hpp', '.inl', '.c', '.cpp', '.cs')
+PREMAKE_OUTPUT_EXTENSIONS = ('.sln', '.vcxproj', '.make')
+# Rutas donde premake5.lua busca el SDK de KTX si no hay ktx_config.lua (además de KTX_SDK)
+PREMAKE_KTX_PATHS = ("C:/Program Files/KTX-Software", "C:/Program Files/KTX-Software-4.3.2")
+
+def WalkProjectTree():
+    """Recorre el proyecto en orden estable, sin .git, carpetas ocultas ni salidas de compilación"""
+    for root, dirs, files in os.walk('.'):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in ('bin', 'bin-int'))
+        yield root, sorted(files)
+
+def PremakeInputsDigest(action):
+    """
+    Huella de todo lo que lee Premake: el contenido de los .lua y de .gitmodules, las
+    variables de entorno de los SDKs, qué rutas de KTX existen y la lista de fuentes que
+    recogen sus patrones `**` (añadir o borrar un .cpp también obliga a regenerar los proyectos).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(action.encode('utf-8'))
+    for name in ('VULKAN_SDK', 'KTX_SDK'):
+        digest.update(f"\0{name}={os.environ.get(name, '')}".encode('utf-8'))
+    # Instalar KTX a mano en una de estas rutas cambia KTX_AVAILABLE aunque no cambie ningún .lua
+    for ktx_path in (*PREMAKE_KTX_PATHS, os.environ.get('KTX_SDK', '')):
+        digest.update(b'\1' if os.path.isfile(ktx_path + "/include/ktx.h") else b'\0')
+    
+    paths = ['.gitmodules'] if os.path.isfile('.gitmodules') else []
+    for root, files in WalkProjectTree():
+        paths.extend(os.path.join(root, name) for name in files if name.endswith(PREMAKE_SOURCE_EXTENSIONS))
+    
+    for path in paths:
+        digest.update(b'\0' + path.replace('\\', '/').encode('utf-8'))
+        if path.endswith(('.lua', '.gitmodules')):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+def PremakeCommand(premake_path, action):
+    # Script explícito: Premake no tiene que buscarlo. Esta versión (5.0.0-beta6) no tiene opción -Q
+    return [premake_path, "--file=premake5.lua", action]
+
+def FindPremakeOutputs():
+    """Archivos de proyecto generados: .sln/.vcxproj con vs2022, Makefile/*.make con gmake2"""
+    return [os.path.join(root, name).replace('\\', '/') for root, files in WalkProjectTree() for name in files
+            if name.endswith(PREMAKE_OUTPUT_EXTENSIONS) or name == 'Makefile']
+
+def LoadPremakeStamp():
+    try:
+        with open(PREMAKE_STAMP_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def SavePremakeStamp(inputs_digest):
+    # Se llama tras ejecutar Premake, así que guarda también los proyectos que acaba de generar
+    with open(PREMAKE_STAMP_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'inputs': inputs_digest, 'outputs': FindPremakeOutputs()}, f, indent=2)
+
+def PremakeUpToDate(inputs_digest, main_output):
+    """True si las entradas no han cambiado y siguen en disco todos los proyectos generados"""
+    stamp = LoadPremakeStamp()
+    return stamp.get('inputs') == inputs_digest and os.path.exists(main_output) \
+        and all(os.path.exists(path) for path in stamp.get('outputs', []))
+
+# Las descargas de red de git no dependen de los SDKs: se solapan con ellos
+print("\n[2/8] Clonando/actualizando submodulos en segundo plano...")
+background = ThreadPoolExecutor(max_workers=1)
+submodules_job = background.submit(SyncSubmodules)
+
+def WaitForSubmodules():
+    """Espera a la sincronización en segundo plano, muestra su salida y devuelve si fue bien"""
+    ok, log = submodules_job.result()
+    background.shutdown()
+    print("\n".join(log))
+    return ok
+
+try:
+    print("\n[3/8] Verificando Vulkan SDK...")
+    vulkanStatus = Vulkan.CheckVulkanSDK()
+    if vulkanStatus is Vulkan.VulkanStatus.INSTALLER_LAUNCHED:
+        # Al salir el intérprete esperaría igualmente al hilo de git: mejor hacerlo a la vista y
+        # mostrar su salida (también los errores) en lugar de dejar la consola parada
+        print("\nEsperando a que terminen los submódulos antes de salir...")
+        WaitForSubmodules()
+        sys.exit(0)
+    if vulkanStatus:
+        # Solo verificar, no intentar descargar
+        Vulkan.CheckVulkanSDKDebugLibs()
+    
+    print("\n[4/8] Verificando KTX-Software SDK...")
+    ktxInstalled = KTX.CheckKTXSDK()
+    if ktxInstalled:
+        KTX.CheckKTXSDKDebugLibs()
+    
+    print("\n[5/8] Esperando a los submodulos...")
+    submodules_ok = WaitForSubmodules()
+except (Exception, KeyboardInterrupt):
+    # Error o Ctrl+C con git aún en segundo plano: pararlo, o la salida se quedaría esperando al hilo
+    StopRunningCommands()
+    background.shutdown(wait=False, cancel_futures=True)
+    raise
+
+def VerifySubmodules():
+    """Comprueba que cada submódulo tenga su header principal"""
+    missing_submodules = []
+    
+    all_ok = True
+    lines = []
+    missing_files = Utils.FindMissingFiles(SUBMODULE_REQUIRED_FILES)
+    for path, name in SUBMODULE_REQUIRED_FILES.items():
+        if path in missing_files:
+            missing_submodules.append(f"{name} ({path})")
+            lines.append(f"✗ Falta: {name}")
+            all_ok = False
+        else:
+            lines.append(f"✓ {name}")
+    sys.stdout.write("\n".join(lines) + "\n")
+    
+    if not all_ok:
+        print("\n" + "!"*60)
+        print("ERROR: Algunos submódulos no se clonaron correctamente.")
+        print("Archivos faltantes:")
+        for item in missing_submodules:
+            print(f"  - {item}")
+        print("\nIntenta ejecutar Setup.bat de nuevo o clonar manualmente:")
+        print("  git clone --recursive https://github.com/lluanllo/Lunex_engine.git")
+        print("!"*60)
+        Utils.Pause("\nPresiona Enter para continuar de todos modos...")
+    else:
+        print("\n✓ Todos los submódulos están correctos")
+
+# Verificar que los submódulos se clonaron correctamente. Si `git submodule update`
+# funcionó a la primera no hace falta (salvo que se pida con LUNEX_SETUP_VERIFY=1)
+if not submodules_ok or os.environ.get('LUNEX_SETUP_VERIFY') == '1':
+    print("\n[6/8] Verificando integridad de submódulos...")
+    VerifySubmodules()
 else:
-    print("\n✓ Todos los submódulos están correctos")
+    print("\n[6/8] Submódulos actualizados correctamente, se omite la verificación")
 
-print("\n[5/8] Configurando Assimp...")
-# Configurar Assimp
-assimp_config = "vendor/assimp/include/assimp/config.h"
-if not os.path.exists(assimp_config):
-    print("  ⚠ Creando config.h para Assimp...")
-    os.makedirs(os.path.dirname(assimp_config), exist_ok=True)
-    with open(assimp_config, 'w') as f:
-        f.write("""#ifndef ASSIMP_CONFIG_H_INC
+ASSIMP_CONFIG_PATH = "vendor/assimp/include/assimp/config.h"
+ASSIMP_CONFIG_BYTES = b"""#ifndef ASSIMP_CONFIG_H_INC
 #define ASSIMP_CONFIG_H_INC
 #define ASSIMP_BUILD_NO_C4D_IMPORTER
 #define ASSIMP_BUILD_NO_DRACO
@@ -121,54 +449,75 @@ if not os.path.exists(assimp_config):
 #define AI_FORCE_INLINE inline
 #endif
 #endif
-""")
-    print("  ✓ config.h creado")
-else:
-    print("  ✓ Assimp ya configurado")
+"""
 
-print("\n[6/8] Verificando Vulkan SDK...")
-vulkanInstalled = Vulkan.CheckVulkanSDK()
-if vulkanInstalled:
-    # Solo verificar, no intentar descargar
-    Vulkan.CheckVulkanSDKDebugLibs()
-
-print("\n[7/8] Verificando KTX-Software SDK...")
-ktxInstalled = KTX.CheckKTXSDK()
-if ktxInstalled:
-    KTX.CheckKTXSDKDebugLibs()
+print("\n[7/8] Configurando Assimp...")
+# Configurar Assimp: O_EXCL crea el archivo solo si no existe, sin pisar un config.h
+# editado a mano ni competir con otro setup que lo esté creando a la vez
+os.makedirs(os.path.dirname(ASSIMP_CONFIG_PATH), exist_ok=True)
+try:
+    fd = os.open(ASSIMP_CONFIG_PATH, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0), 0o644)
+except FileExistsError:
+    print("  ✓ Assimp ya configurado")
+else:
+    print("  ⚠ Creando config.h para Assimp...")
+    try:
+        os.write(fd, ASSIMP_CONFIG_BYTES)
+    finally:
+        os.close(fd)
+    print("  ✓ config.h creado")
 
 print("\n[8/8] Generando archivos de proyecto con Premake...")
-if os.name == 'nt':  # Windows
+if _IS_WIN:
     premake_path = "vendor/bin/premake/premake5.exe"
+    premake_action, premake_output = "vs2022", "Lunex-Engine.sln"
+else:
+    premake_path = "vendor/bin/premake/premake5"
+    premake_action, premake_output = "gmake2", "Makefile"
+
+# Sin cambios en los .lua ni en la lista de fuentes, los proyectos generados siguen valiendo
+premake_stamp = PremakeInputsDigest(premake_action)
+if PremakeUpToDate(premake_stamp, premake_output):
+    print("  ✓ Archivos de proyecto al día, se omite Premake")
+elif _IS_WIN:
     if not os.path.exists(premake_path):
         print(f"ERROR: Premake no encontrado en {premake_path}")
-        input("Presiona Enter para salir...")
+        Utils.Pause("Presiona Enter para salir...")
         sys.exit(1)
     
-    result = subprocess.call([premake_path, "vs2022"])
+    result = RunCommand(PremakeCommand(premake_path, premake_action), show=True)
     if result != 0:
         print("ERROR: Premake falló al generar los archivos de proyecto")
-        input("Presiona Enter para salir...")
+        Utils.Pause("Presiona Enter para salir...")
         sys.exit(1)
+    SavePremakeStamp(premake_stamp)
 else:
-    subprocess.call(["vendor/bin/premake/premake5", "gmake2"])
-
-print("\n" + "="*60)
-print("✓ Setup completado correctamente!")
-print("="*60)
-print("\nVerificación final:")
-print("  ✓ Box2D - Motor de física 2D")
-print("  ✓ Bullet3 - Motor de física 3D")
-print("  ✓ Assimp - Carga de modelos 3D")
-print("  ✓ GLFW - Manejo de ventanas")
-print("  ✓ ImGui - Interfaz de usuario")
-print("  ✓ Vulkan SDK - Compilación de shaders SPIR-V")
+    if RunCommand(PremakeCommand(premake_path, premake_action), show=True) == 0:
+        SavePremakeStamp(premake_stamp)
+
+# Resumen final en una sola escritura
+summary = [
+    "",
+    "="*60,
+    "✓ Setup completado correctamente!",
+    "="*60,
+    "\nVerificación final:",
+    "  ✓ Box2D - Motor de física 2D",
+    "  ✓ Bullet3 - Motor de física 3D",
+    "  ✓ Assimp - Carga de modelos 3D",
+    "  ✓ GLFW - Manejo de ventanas",
+    "  ✓ ImGui - Interfaz de usuario",
+    "  ✓ Vulkan SDK - Compilación de shaders SPIR-V",
+]
 if ktxInstalled:
-    print("  ✓ KTX-Software - Compresión de texturas GPU")
+    summary.append("  ✓ KTX-Software - Compresión de texturas GPU")
 else:
-    print("  ⚠ KTX-Software - No instalado (modo compatibilidad)")
-print("\nSiguientes pasos:")
-print("  1. Abre 'Lunex-Engine.sln' en Visual Studio")
-print("  2. Selecciona la configuración 'Debug' o 'Release'")
-print("  3. Compila el proyecto (Ctrl+Shift+B)")
-print("="*60)
\ No newline at end of file
+    summary.append("  ⚠ KTX-Software - No instalado (modo compatibilidad)")
+summary += [
+    "\nSiguientes pasos:",
+    "  1. Abre 'Lunex-Engine.sln' en Visual Studio",
+    "  2. Selecciona la configuración 'Debug' o 'Release'",
+    "  3. Compila el proyecto (Ctrl+Shift+B)",
+    "="*60,
+]
+sys.stdout.write("\n".join(summary) + "\n")
\ No newline at end of file
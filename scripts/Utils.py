@@ -1,18 +1,34 @@
-import requests
+import os
 import sys
 import time
 
-from fake_useragent import UserAgent
+# Buffer size for block copies while extracting archives (1 MiB)
+COPY_BUFFER_SIZE = 1024*1024
+
+_SESSION = None
+
+def GetSession():
+    """Shared HTTP session, so every download after the first reuses its keep-alive connection"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from fake_useragent import UserAgent
+
+        _SESSION = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        _SESSION.mount('https://', adapter)
+        _SESSION.mount('http://', adapter)
+        _SESSION.headers['User-Agent'] = UserAgent().chrome
+    return _SESSION
 
 def DownloadFile(url, filepath):
-    with open(filepath, 'wb') as f:
-        ua = UserAgent()
-        headers = {'User-Agent': ua.chrome}
-        response = requests.get(url, headers=headers, stream=True)
+    with open(filepath, 'wb') as f, GetSession().get(url, stream=True, timeout=30) as response:
         total = response.headers.get('content-length')
 
         if total is None:
-            f.write(response.content)
+            for data in response.iter_content(chunk_size=1024*1024):
+                f.write(data)
         else:
             downloaded = 0
             total = int(total)
@@ -32,6 +48,146 @@ def DownloadFile(url, filepath):
                 sys.stdout.flush()
     sys.stdout.write('\n')
 
+def FindMissingFiles(paths):
+    """Returns the subset of paths that do not exist, reading each parent directory once"""
+    from collections import defaultdict
+
+    byDirectory = defaultdict(dict)
+    for path in paths:
+        byDirectory[os.path.dirname(path)][os.path.basename(path)] = path
+
+    missing = set()
+    for directory, names in byDirectory.items():
+        try:
+            with os.scandir(directory or '.') as entries:
+                present = {entry.name for entry in entries}
+        except OSError:
+            present = set()
+        missing.update(names[name] for name in names.keys() - present)
+    return missing
+
+def FileSnapshot(paths):
+    """(mtime, size) of every path, or None if it is missing. Pass it to WaitForFiles as `since`"""
+    snapshot = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            snapshot[path] = None
+    return snapshot
+
+def _EnterPressed():
+    """Non-blocking check for Enter on an interactive console"""
+    try:
+        import msvcrt
+    except ImportError:
+        import select
+        # The terminal is line-buffered, so stdin only becomes readable once Enter is pressed
+        if select.select([sys.stdin], [], [], 0)[0]:
+            sys.stdin.readline()
+            return True
+        return False
+
+    while msvcrt.kbhit():
+        if msvcrt.getwch() in '\r\n':
+            return True
+    return False
+
+def WaitForFiles(paths, interval=0.5, timeout=30 * 60, since=None):
+    """
+    Polls until every path exists, differs from its state in `since` (a FileSnapshot taken
+    before launching whatever writes it) and kept the same size and mtime for two polls.
+    Enter stops the wait early on an interactive console; otherwise it gives up after `timeout` seconds.
+    Returns True once the files are updated, or, after Enter or the timeout, if they all exist.
+    """
+    since = since or {}
+    interactive = sys.stdin is not None and sys.stdin.isatty()
+    if not interactive:
+        print(f"(modo no interactivo: se espera como maximo {timeout // 60} min)")
+
+    deadline = time.monotonic() + timeout
+    previous = None
+    while True:
+        current = FileSnapshot(paths)
+        if all(state is not None and state != since.get(path) for path, state in current.items()):
+            # An installer may still be writing the files: require two equal polls
+            if current == previous:
+                return True
+            previous = current
+        else:
+            previous = None
+        if interactive and _EnterPressed():
+            break
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(interval)
+
+    return not FindMissingFiles(paths)
+
+def _ZipMemberTarget(extractTo, name):
+    relative = os.path.normpath(name)
+    if os.path.isabs(relative) or os.path.splitdrive(relative)[0] or relative.split(os.sep)[0] == '..':
+        raise ValueError(f'Ruta no valida en el zip: {name}')
+    return os.path.join(extractTo, relative)
+
+def ExtractZip(zipPath, extractTo, memberFilter=None, workers=None):
+    import threading
+    import zipfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    with zipfile.ZipFile(zipPath, 'r') as zipRef:
+        members = [info for info in zipRef.infolist() if memberFilter is None or memberFilter(info.filename)]
+    targets = [(info, _ZipMemberTarget(extractTo, info.filename)) for info in members]
+
+    # Create every destination directory up front, once
+    directories = {target if info.is_dir() else os.path.dirname(target) for info, target in targets}
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+
+    # ZipFile objects are not thread-safe: each worker opens its own handle and buffer
+    local = threading.local()
+    handles = []
+
+    def ExtractMember(info, target):
+        if not hasattr(local, 'zipRef'):
+            local.zipRef = zipfile.ZipFile(zipPath, 'r')
+            local.buffer = memoryview(bytearray(COPY_BUFFER_SIZE))
+            handles.append(local.zipRef)
+        buffer = local.buffer
+        with local.zipRef.open(info) as src, open(target, 'wb') as dst:
+            while True:
+                read = src.readinto(buffer)
+                if not read:
+                    break
+                dst.write(buffer[:read])
+
+    workers = workers or os.cpu_count() or 1
+    # Keep at most two members per worker in flight
+    inFlight = threading.BoundedSemaphore(2 * workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for info, target in targets:
+                if info.is_dir():
+                    continue
+                inFlight.acquire()
+                future = executor.submit(ExtractMember, info, target)
+                future.add_done_callback(lambda _: inFlight.release())
+                futures.append(future)
+            for future in futures:
+                future.result()
+    finally:
+        for handle in handles:
+            handle.close()
+
+def Pause(message):
+    """Waits for Enter, unless stdin is not a terminal (CI), where nobody could press it"""
+    if sys.stdin is not None and sys.stdin.isatty():
+        input(message)
+    else:
+        print(f"{message} (modo no interactivo, se continua)")
+
 def YesOrNo():
     while True:
         reply = str(input('[Y/N]: ')).lower().strip()
@@ -1,69 +1,88 @@
-﻿import os
-import subprocess
-import sys
-from pathlib import Path
+﻿import enum
+import os
+import re
 
 import Utils
 
-from io import BytesIO
-from urllib.request import urlopen
-from zipfile import ZipFile
-
 VULKAN_SDK = os.environ.get('VULKAN_SDK')
 VULKAN_SDK_INSTALLER_URL = 'https://sdk.lunarg.com/sdk/download/1.3.290.0/windows/VulkanSDK-1.3.290.0-Installer.exe'
 LUNEX_VULKAN_VERSION = '1.3.290'
 VULKAN_SDK_EXE_PATH = 'Lunex/vendor/VulkanSDK/VulkanSDK.exe'
 
+# La version debe ser un componente completo de la ruta (p.ej. C:\VulkanSDK\1.3.290.0),
+# no cualquier carpeta que la contenga
+_VK_VER_RE = re.compile(rf"(?:^|[\\/]){re.escape(LUNEX_VULKAN_VERSION)}(?:\.\d+)?(?:[\\/]|$)")
+_VULKAN_BASENAME = os.path.basename(VULKAN_SDK.rstrip('\\/')) if VULKAN_SDK else None
+
+class VulkanStatus(enum.Enum):
+    """
+    Resultado de CheckVulkanSDK. Solo FOUND es verdadero, para que `if CheckVulkanSDK():`
+    no tome por bueno un SDK que aún se está instalando.
+    """
+    FOUND = 'found'
+    MISSING = 'missing'
+    # Se lanzó el instalador: Setup debe terminar y volver a ejecutarse cuando acabe
+    INSTALLER_LAUNCHED = 'installer-launched'
+    
+    def __bool__(self):
+        return self is VulkanStatus.FOUND
+
 def InstallVulkanSDK():
     print(f'Downloading {VULKAN_SDK_INSTALLER_URL} to {VULKAN_SDK_EXE_PATH}')
     os.makedirs(os.path.dirname(VULKAN_SDK_EXE_PATH), exist_ok=True)
     Utils.DownloadFile(VULKAN_SDK_INSTALLER_URL, VULKAN_SDK_EXE_PATH)
     print("Done!")
     print("Running Vulkan SDK installer...")
+    # startfile (ShellExecute) vuelve en cuanto lanza el instalador y gestiona su UAC;
+    # hasta que el SDK este instalado Setup no tiene nada mas que hacer
     os.startfile(os.path.abspath(VULKAN_SDK_EXE_PATH))
     print("\n" + "="*60)
-    print("IMPORTANTE: Despues de instalar Vulkan SDK:")
-    print("  1. Cierra esta ventana")
-    print("  2. Reinicia tu PC o abre una nueva terminal")
-    print("  3. Vuelve a ejecutar Setup.bat")
+    print("IMPORTANTE: El instalador de Vulkan SDK sigue abierto. Cuando termine:")
+    print("  1. Reinicia tu PC o abre una nueva terminal")
+    print("  2. Vuelve a ejecutar Setup.bat")
     print("="*60)
-    input("\nPresiona Enter para salir...")
-    sys.exit(0)
 
 def InstallVulkanPrompt():
+    """Devuelve VulkanStatus.INSTALLER_LAUNCHED si se instala, o VulkanStatus.MISSING si no"""
     print("\nDeseas instalar el Vulkan SDK?")
     install = Utils.YesOrNo()
     if install:
         InstallVulkanSDK()
-    else:
-        print("\nADVERTENCIA: El proyecto requiere Vulkan SDK para compilar.")
-        print("Puedes instalarlo manualmente desde: https://vulkan.lunarg.com/")
-        return False
-    return True
+        return VulkanStatus.INSTALLER_LAUNCHED
+    
+    print("\nADVERTENCIA: El proyecto requiere Vulkan SDK para compilar.")
+    print("Puedes instalarlo manualmente desde: https://vulkan.lunarg.com/")
+    return VulkanStatus.MISSING
 
 def CheckVulkanSDK():
+    """
+    Devuelve VulkanStatus.FOUND si el SDK correcto está instalado; si no, el resultado de
+    ofrecer instalarlo (VulkanStatus.INSTALLER_LAUNCHED o VulkanStatus.MISSING).
+    """
     if VULKAN_SDK is None:
         print("\n" + "!"*60)
         print("ERROR: Vulkan SDK no esta instalado!")
         print("!"*60)
         return InstallVulkanPrompt()
-    elif LUNEX_VULKAN_VERSION not in VULKAN_SDK:
+    elif not _VK_VER_RE.search(VULKAN_SDK):
         print(f"\nVulkan SDK encontrado en: {VULKAN_SDK}")
         print(f"ADVERTENCIA: Version incorrecta detectada!")
         print(f"  - Requerida: {LUNEX_VULKAN_VERSION}")
-        print(f"  - Actual: {os.path.basename(VULKAN_SDK)}")
+        print(f"  - Actual: {_VULKAN_BASENAME}")
         print("\nPuedes continuar, pero pueden haber problemas de compatibilidad.")
         print("Deseas instalar la version correcta?")
         return InstallVulkanPrompt()
     
     print(f"✓ Vulkan SDK correcto encontrado: {VULKAN_SDK}")
-    return True
+    return VulkanStatus.FOUND
 
 def CheckVulkanSDKDebugLibs():
     """
     Las librerías de debug vienen incluidas en el instalador principal del Vulkan SDK.
     Esta función verifica que el SDK esté instalado correctamente.
     """
+    from pathlib import Path
+    
     if VULKAN_SDK is None:
         print("\n⚠️ Vulkan SDK no está instalado.")
         print("Las librerías de Vulkan no estarán disponibles hasta que lo instales.")